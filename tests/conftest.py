@@ -0,0 +1,52 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import app, get_activities_db
+
+# pytest-xdist is available but not enabled by default: with a single test
+# file, --dist=loadfile sends every test to one worker and the others only add
+# start-up cost. Once there are several test files, run `pytest -n auto
+# --dist=loadfile` to spread them across workers.
+
+
+def pytest_addoption(parser):
+    parser.addoption("--run-integration", action="store_true", default=False,
+                     help="run tests marked as integration")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip integration tests unless --run-integration is given"""
+    if config.getoption("--run-integration"):
+        return
+    skip_integration = pytest.mark.skip(reason="needs --run-integration to run")
+    for item in items:
+        if "integration" in item.keywords:
+            item.add_marker(skip_integration)
+
+
+@pytest.fixture(scope="session")
+async def client():
+    """Create a single async client for the FastAPI app, shared by all tests"""
+    async with AsyncClient(transport=ASGITransport(app=app),
+                           base_url="http://testserver") as client:
+        yield client
+
+
+@pytest.fixture(scope="session", autouse=True)
+async def warm_up(client):
+    """Send one request through the app before any test runs, so its lazy
+    setup is not timed as part of whichever test happens to run first"""
+    # Go through a dependency override like the tests do, without touching
+    # the app's real activities
+    app.dependency_overrides[get_activities_db] = lambda: {}
+    await client.get("/activities")
+    app.dependency_overrides.pop(get_activities_db, None)
+
+
+@pytest.fixture
+def participants_count(client):
+    """Return a helper that counts the participants in an activity"""
+    async def count(activity):
+        response = await client.get("/activities")
+        return len(response.json()[activity]["participants"])
+    return count
@@ -1,64 +1,78 @@
+import asyncio
 import pytest
-from fastapi.testclient import TestClient
-import sys
-from pathlib import Path
+from urllib.parse import quote
 
-# Add src directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from fastapi.responses import RedirectResponse
 
-from app import app
+from app import app, get_activities_db
 
+# Activity names as URL path segments, quoted once at import
+CHESS = quote("Chess Club")
+GYM = quote("Gym Class")
+NONEXISTENT = quote("Nonexistent Activity")
 
-@pytest.fixture
-def client():
-    """Create a test client for the FastAPI app"""
-    return TestClient(app)
+# Endpoint URLs used more than once
+ACTIVITIES_URL = "/activities"
+CHESS_SIGNUP_URL = f"/activities/{CHESS}/signup"
+CHESS_UNREGISTER_URL = f"/activities/{CHESS}/unregister"
+GYM_SIGNUP_URL = f"/activities/{GYM}/signup"
+GYM_UNREGISTER_URL = f"/activities/{GYM}/unregister"
+
+
+@pytest.fixture(scope="session")
+def activities_template():
+    """Original activities as (name, description, schedule, max, participants)"""
+    return (
+        ("Chess Club",
+         "Learn strategies and compete in chess tournaments",
+         "Fridays, 3:30 PM - 5:00 PM",
+         12,
+         ("michael@mergington.edu", "daniel@mergington.edu")),
+        ("Programming Class",
+         "Learn programming fundamentals and build software projects",
+         "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
+         20,
+         ("emma@mergington.edu", "sophia@mergington.edu")),
+        ("Gym Class",
+         "Physical education and sports activities",
+         "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
+         30,
+         ("john@mergington.edu", "olivia@mergington.edu")),
+    )
 
 
 @pytest.fixture(autouse=True)
-def reset_activities():
-    """Reset activities to initial state before each test"""
-    from app import activities
-    
-    # Store original activities
-    original = {
-        "Chess Club": {
-            "description": "Learn strategies and compete in chess tournaments",
-            "schedule": "Fridays, 3:30 PM - 5:00 PM",
-            "max_participants": 12,
-            "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
-        },
-        "Programming Class": {
-            "description": "Learn programming fundamentals and build software projects",
-            "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
-            "max_participants": 20,
-            "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
-        },
-        "Gym Class": {
-            "description": "Physical education and sports activities",
-            "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
-            "max_participants": 30,
-            "participants": ["john@mergington.edu", "olivia@mergington.edu"]
+def activities(activities_template):
+    """Give each test its own fresh copy of the activities"""
+    db = {
+        name: {
+            "description": description,
+            "schedule": schedule,
+            "max_participants": max_participants,
+            "participants": list(participants)
         }
+        for name, description, schedule, max_participants, participants
+        in activities_template
     }
-    
-    # Clear and reset
-    activities.clear()
-    activities.update(original)
-    
-    yield
-    
-    # Reset again after test
-    activities.clear()
-    activities.update(original)
+    app.dependency_overrides[get_activities_db] = lambda: db
+    yield db
+    app.dependency_overrides.pop(get_activities_db, None)
 
 
 class TestRoot:
     """Test the root endpoint"""
     
-    def test_root_redirect(self, client):
+    async def test_root_redirect(self, client):
         """Test that root redirects to /static/index.html"""
-        response = client.get("/", follow_redirects=False)
+        response = await client.get("/", follow_redirects=False)
+        assert response.status_code == 307
+        assert response.headers["location"] == "/static/index.html"
+
+    def test_root_route_redirects(self):
+        """Test the root route's endpoint without an HTTP round-trip"""
+        route = next(r for r in app.routes if r.path == "/")
+        response = route.endpoint()
+        assert isinstance(response, RedirectResponse)
         assert response.status_code == 307
         assert response.headers["location"] == "/static/index.html"
 
@@ -66,9 +80,9 @@ class TestRoot:
 class TestGetActivities:
     """Test the get activities endpoint"""
     
-    def test_get_activities_success(self, client):
+    async def test_get_activities_success(self, client):
         """Test getting all activities"""
-        response = client.get("/activities")
+        response = await client.get(ACTIVITIES_URL)
         assert response.status_code == 200
         
         data = response.json()
@@ -76,75 +90,78 @@ class TestGetActivities:
         assert "Programming Class" in data
         assert "Gym Class" in data
         
-    def test_get_activities_has_correct_structure(self, client):
+    async def test_get_activities_has_correct_structure(self, client):
         """Test that activities have the correct structure"""
-        response = client.get("/activities")
+        response = await client.get(ACTIVITIES_URL)
         data = response.json()
         
         activity = data["Chess Club"]
-        assert "description" in activity
-        assert "schedule" in activity
-        assert "max_participants" in activity
-        assert "participants" in activity
+        assert {"description", "schedule", "max_participants", "participants"} <= activity.keys()
         assert isinstance(activity["participants"], list)
 
 
-class TestSignup:
-    """Test the signup endpoint"""
+class TestSignupAndUnregister:
+    """Behaviour shared by the signup and unregister endpoints"""
     
-    def test_signup_success(self, client):
-        """Test successful signup"""
-        response = client.post(
-            "/activities/Chess%20Club/signup",
-            params={"email": "newstudent@mergington.edu"}
-        )
+    @pytest.mark.parametrize("url, email, message", [
+        (CHESS_SIGNUP_URL, "newstudent@mergington.edu", "Signed up"),
+        (CHESS_UNREGISTER_URL, "michael@mergington.edu", "Unregistered"),
+    ])
+    async def test_endpoint_success(self, client, url, email, message):
+        """Test successful signup and unregister"""
+        response = await client.post(url, params={"email": email})
         assert response.status_code == 200
         data = response.json()
-        assert "Signed up" in data["message"]
-        assert "newstudent@mergington.edu" in data["message"]
+        assert message in data["message"]
+        assert email in data["message"]
         
-    def test_signup_adds_participant(self, client):
+    @pytest.mark.parametrize("endpoint, email", [
+        ("signup", "test@mergington.edu"),
+        # A registered student, so the 404 can only come from the activity
+        ("unregister", "michael@mergington.edu"),
+    ])
+    async def test_endpoint_activity_not_found(self, client, endpoint, email):
+        """Test signup and unregister for a non-existent activity"""
+        response = await client.post(
+            f"/activities/{NONEXISTENT}/{endpoint}",
+            params={"email": email}
+        )
+        assert response.status_code == 404
+        assert "not found" in response.json()["detail"]
+
+
+class TestSignup:
+    """Test the signup endpoint"""
+    
+    async def test_signup_adds_participant(self, client, activities):
         """Test that signup actually adds the participant"""
-        client.post(
-            "/activities/Chess%20Club/signup",
+        await client.post(
+            CHESS_SIGNUP_URL,
             params={"email": "test@mergington.edu"}
         )
         
-        response = client.get("/activities")
-        data = response.json()
-        assert "test@mergington.edu" in data["Chess Club"]["participants"]
+        assert "test@mergington.edu" in activities["Chess Club"]["participants"]
         
-    def test_signup_already_registered(self, client):
+    async def test_signup_already_registered(self, client):
         """Test that signing up twice fails"""
         email = "michael@mergington.edu"
-        response = client.post(
-            "/activities/Chess%20Club/signup",
+        response = await client.post(
+            CHESS_SIGNUP_URL,
             params={"email": email}
         )
         assert response.status_code == 400
         assert "already signed up" in response.json()["detail"]
         
-    def test_signup_activity_not_found(self, client):
-        """Test signup to non-existent activity"""
-        response = client.post(
-            "/activities/Nonexistent%20Activity/signup",
-            params={"email": "test@mergington.edu"}
-        )
-        assert response.status_code == 404
-        assert "not found" in response.json()["detail"]
-        
-    def test_signup_participant_count_increases(self, client):
+    async def test_signup_participant_count_increases(self, client, participants_count):
         """Test that participant count increases after signup"""
-        response_before = client.get("/activities")
-        count_before = len(response_before.json()["Chess Club"]["participants"])
+        count_before = await participants_count("Chess Club")
         
-        client.post(
-            "/activities/Chess%20Club/signup",
+        await client.post(
+            CHESS_SIGNUP_URL,
             params={"email": "newuser@mergington.edu"}
         )
         
-        response_after = client.get("/activities")
-        count_after = len(response_after.json()["Chess Club"]["participants"])
+        count_after = await participants_count("Chess Club")
         
         assert count_after == count_before + 1
 
@@ -152,120 +169,96 @@ class TestSignup:
 class TestUnregister:
     """Test the unregister endpoint"""
     
-    def test_unregister_success(self, client):
-        """Test successful unregister"""
-        response = client.post(
-            "/activities/Chess%20Club/unregister",
-            params={"email": "michael@mergington.edu"}
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert "Unregistered" in data["message"]
-        assert "michael@mergington.edu" in data["message"]
-        
-    def test_unregister_removes_participant(self, client):
+    async def test_unregister_removes_participant(self, client, activities):
         """Test that unregister actually removes the participant"""
-        client.post(
-            "/activities/Chess%20Club/unregister",
+        await client.post(
+            CHESS_UNREGISTER_URL,
             params={"email": "michael@mergington.edu"}
         )
         
-        response = client.get("/activities")
-        data = response.json()
-        assert "michael@mergington.edu" not in data["Chess Club"]["participants"]
+        assert "michael@mergington.edu" not in activities["Chess Club"]["participants"]
         
-    def test_unregister_not_registered(self, client):
+    async def test_unregister_not_registered(self, client):
         """Test unregistering someone not in the activity"""
-        response = client.post(
-            "/activities/Chess%20Club/unregister",
+        response = await client.post(
+            CHESS_UNREGISTER_URL,
             params={"email": "notregistered@mergington.edu"}
         )
         assert response.status_code == 400
         assert "not registered" in response.json()["detail"]
         
-    def test_unregister_activity_not_found(self, client):
-        """Test unregister from non-existent activity"""
-        response = client.post(
-            "/activities/Nonexistent%20Activity/unregister",
-            params={"email": "michael@mergington.edu"}
-        )
-        assert response.status_code == 404
-        assert "not found" in response.json()["detail"]
-        
-    def test_unregister_participant_count_decreases(self, client):
+    async def test_unregister_participant_count_decreases(self, client, participants_count):
         """Test that participant count decreases after unregister"""
-        response_before = client.get("/activities")
-        count_before = len(response_before.json()["Chess Club"]["participants"])
+        count_before = await participants_count("Chess Club")
         
-        client.post(
-            "/activities/Chess%20Club/unregister",
+        await client.post(
+            CHESS_UNREGISTER_URL,
             params={"email": "michael@mergington.edu"}
         )
         
-        response_after = client.get("/activities")
-        count_after = len(response_after.json()["Chess Club"]["participants"])
+        count_after = await participants_count("Chess Club")
         
         assert count_after == count_before - 1
 
 
+@pytest.mark.integration
 class TestIntegration:
     """Integration tests"""
     
-    def test_signup_then_unregister(self, client):
+    async def test_signup_then_unregister(self, client):
         """Test signing up and then unregistering"""
         email = "integration@mergington.edu"
-        activity = "Chess%20Club"
         
         # Signup
-        response = client.post(
-            f"/activities/{activity}/signup",
+        response = await client.post(
+            CHESS_SIGNUP_URL,
             params={"email": email}
         )
         assert response.status_code == 200
         
         # Verify participant added
-        response = client.get("/activities")
+        response = await client.get(ACTIVITIES_URL)
         assert email in response.json()["Chess Club"]["participants"]
         
         # Unregister
-        response = client.post(
-            f"/activities/{activity}/unregister",
+        response = await client.post(
+            CHESS_UNREGISTER_URL,
             params={"email": email}
         )
         assert response.status_code == 200
         
         # Verify participant removed
-        response = client.get("/activities")
+        response = await client.get(ACTIVITIES_URL)
         assert email not in response.json()["Chess Club"]["participants"]
         
-    def test_multiple_signups_and_unregisters(self, client):
+    async def test_multiple_signups_and_unregisters(self, client, activities):
         """Test multiple signup and unregister operations"""
-        activity = "Gym%20Class"
         emails = ["user1@mergington.edu", "user2@mergington.edu", "user3@mergington.edu"]
         
-        # Sign up all users
-        for email in emails:
-            response = client.post(
-                f"/activities/{activity}/signup",
-                params={"email": email}
-            )
+        # Sign up all users concurrently. FastAPI runs the sync endpoints in
+        # its threadpool, so these requests really do overlap; this is only
+        # safe because every email is distinct and list append/remove are
+        # atomic under the GIL. The endpoints' check-then-append is not.
+        responses = await asyncio.gather(*(
+            client.post(GYM_SIGNUP_URL, params={"email": email})
+            for email in emails
+        ))
+        for response in responses:
             assert response.status_code == 200
         
         # Verify all added
-        response = client.get("/activities")
+        participants = activities["Gym Class"]["participants"]
         for email in emails:
-            assert email in response.json()["Gym Class"]["participants"]
+            assert email in participants
         
         # Unregister some
-        for email in emails[:2]:
-            client.post(
-                f"/activities/{activity}/unregister",
-                params={"email": email}
-            )
+        await asyncio.gather(*(
+            client.post(GYM_UNREGISTER_URL, params={"email": email})
+            for email in emails[:2]
+        ))
         
         # Verify correct ones removed
-        response = client.get("/activities")
-        participants = response.json()["Gym Class"]["participants"]
+        participants = activities["Gym Class"]["participants"]
         assert emails[0] not in participants
         assert emails[1] not in participants
         assert emails[2] in participants